@@ -7,32 +7,50 @@ Examples:
   python scripts/generate_daily_blogs.py --regen-step1 --limit 10
   python scripts/generate_daily_blogs.py --from-date 2026-01-01 --to-date 2026-02-20
   python scripts/generate_daily_blogs.py --dry-run
+  python scripts/generate_daily_blogs.py --overwrite --refresh-cache
+
+Model responses are cached under .cache/openrouter/ keyed on model + prompt,
+so re-runs of the same day reuse the earlier response (see --no-cache).
 """
 
 from __future__ import annotations
 
 import argparse
+import base64
+import bisect
+import email.utils
+import functools
+import hashlib
+import http.client
 import json
+import mmap
 import os
+import random
 import re
 import subprocess
 import sys
+import tempfile
+import threading
 import time
-import urllib.error
 import urllib.request
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
+from urllib.parse import unquote, urlsplit
 
 ROOT = Path(__file__).resolve().parents[1]
 BLOG_DIR = ROOT / "content" / "blog"
+CACHE_DIR = ROOT / ".cache" / "openrouter"
 
 GIT_CHRONICLE_DIR = Path("/home/ryan/tools/git-chronicle")
 DEFAULT_IDEAS_FILE = GIT_CHRONICLE_DIR / "data" / "enhanced" / "daily-blog-ideas.json"
 
 OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+_OPENROUTER = urlsplit(OPENROUTER_URL)
 DEFAULT_MODEL = "qwen/qwen3-235b-a22b-2507"
 DEFAULT_AUTHOR = "Ryan Dashwood"
+MAX_RETRY_DELAY = 120.0
 
 # Authoritative stack corrections for known historical naming drift.
 PROJECT_STACK_OVERRIDES: dict[str, str] = {
@@ -40,7 +58,65 @@ PROJECT_STACK_OVERRIDES: dict[str, str] = {
     "AustinsElite (Next.js)": "Primary AustinsElite production app on Laravel 12 (historical label is stale), not Next.js.",
 }
 
+# Date-independent tail of every writer prompt.
+PROMPT_RULES = """Return STRICT JSON only (no markdown fences, no prose outside JSON):
+{
+  "title": "",
+  "excerpt": "",
+  "tags": ["", "", ""],
+  "content": ""
+}
 
+Rules:
+- First-person voice, practical, builder-focused.
+- 500-1100 words.
+- Must include at least 3 section headings using Markdown (## Heading).
+- Ground claims in the supplied context; do not invent fake projects/events.
+- Treat STACK CORRECTIONS as truth even if labels/idea text suggest otherwise.
+- If supplied ideas conflict with stack corrections, rewrite them to be technically accurate.
+- Keep tone punchy and human (not corporate).
+- Excerpt must be 1 sentence, under 170 chars.
+- Tags: 3-6 concise tags.
+- Ryan only uses Next.js for this blog project (`my-portfolio` / `dashwood.net`).
+- Do NOT use `Next.js` as a tag unless the post is explicitly about this blog project.
+- For all other projects, prefer tags like `Laravel`, `Hybrid Architecture`, `Frontend`, `Full-Stack`, `PHP`.
+- `content` must be markdown body only (NO frontmatter).
+"""
+
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+_BAD_ESC_RE = re.compile(r'(?<!\\)\\(?!["\\/bfnrtu])')
+_YAML_TRANS = str.maketrans({"\\": "\\\\", '"': '\\"'})
+
+# When any worker is rate limited, every worker holds off until this
+# time.monotonic() deadline instead of racing into the same 429.
+_rate_limit_lock = threading.Lock()
+_rate_limit_until = 0.0
+
+# One keep-alive HTTPS connection per worker thread, so parallel generations
+# reuse their TLS session instead of handshaking on every request.
+_conn_local = threading.local()
+
+
+def read_env_value(env_file: Path, name: str) -> str | None:
+    """Return the value of the first `name=` line in env_file, scanning it in place via mmap."""
+    needle = name.encode("utf-8") + b"="
+    try:
+        with env_file.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[: len(needle)] == needle:
+                start = len(needle)
+            else:
+                idx = mm.find(b"\n" + needle)
+                if idx == -1:
+                    return None
+                start = idx + 1 + len(needle)
+            end = mm.find(b"\n", start)
+            value = mm[start : end if end != -1 else len(mm)]
+    except (OSError, ValueError):  # ValueError: empty files can't be mapped
+        return None
+    return value.decode("utf-8", errors="replace").strip()
+
+
+@functools.lru_cache(maxsize=1)
 def load_api_key() -> str:
     key = os.environ.get("OPENROUTER_API_KEY", "").strip()
     if key:
@@ -53,13 +129,108 @@ def load_api_key() -> str:
     ]:
         if not env_file.exists():
             continue
-        for line in env_file.read_text().splitlines():
-            if line.startswith("OPENROUTER_API_KEY="):
-                return line.split("=", 1)[1].strip()
+        value = read_env_value(env_file, "OPENROUTER_API_KEY")
+        if value is not None:
+            return value
 
     raise RuntimeError("OPENROUTER_API_KEY not found in environment or known .env files")
 
 
+@functools.lru_cache(maxsize=None)
+def openrouter_headers(api_key: str) -> dict[str, str]:
+    # Shared across calls and workers; callers must not mutate it.
+    return {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+        "HTTP-Referer": "https://dashwood.dev",
+    }
+
+
+def retry_after_seconds(value: str | None) -> float | None:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds from now."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return min(MAX_RETRY_DELAY, max(0.0, float(value)))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return min(MAX_RETRY_DELAY, max(0.0, (when - datetime.now(timezone.utc)).total_seconds()))
+
+
+def backoff_seconds(attempt: int) -> float:
+    # Up to 30% jitter so workers that failed together don't retry in lockstep.
+    delay = min(30, 2 ** attempt + 2)
+    return delay + random.uniform(0, 0.3 * delay)
+
+
+def wait_for_rate_limit():
+    with _rate_limit_lock:
+        delay = _rate_limit_until - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+
+
+def defer_requests(seconds: float):
+    global _rate_limit_until
+    with _rate_limit_lock:
+        _rate_limit_until = max(_rate_limit_until, time.monotonic() + seconds)
+
+
+def new_openrouter_connection() -> http.client.HTTPSConnection:
+    # Honour HTTPS_PROXY/NO_PROXY like urlopen did, tunnelling through the proxy with CONNECT.
+    proxy = urllib.request.getproxies().get("https")
+    if not proxy or urllib.request.proxy_bypass(_OPENROUTER.hostname):
+        return http.client.HTTPSConnection(_OPENROUTER.netloc, timeout=120)
+
+    parts = urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+    tunnel_headers = {}
+    if parts.username:
+        creds = f"{unquote(parts.username)}:{unquote(parts.password or '')}"
+        tunnel_headers["Proxy-Authorization"] = "Basic " + base64.b64encode(creds.encode("utf-8")).decode("ascii")
+    conn = http.client.HTTPSConnection(parts.hostname, parts.port or 80, timeout=120)
+    conn.set_tunnel(_OPENROUTER.netloc, headers=tunnel_headers)
+    return conn
+
+
+def openrouter_connection() -> http.client.HTTPSConnection:
+    conn = getattr(_conn_local, "conn", None)
+    if conn is None:
+        conn = new_openrouter_connection()
+        _conn_local.conn = conn
+    return conn
+
+
+def drop_openrouter_connection():
+    conn = getattr(_conn_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _conn_local.conn = None
+
+
+def send_openrouter_request(body: bytes, headers: dict[str, str]) -> http.client.HTTPResponse:
+    conn = openrouter_connection()
+    reused = conn.sock is not None
+    try:
+        conn.request("POST", _OPENROUTER.path, body=body, headers=headers)
+        return conn.getresponse()
+    except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+        drop_openrouter_connection()
+        if not reused:
+            raise
+
+    # The server closed an idle keep-alive socket before answering; resend once on a fresh one.
+    conn = openrouter_connection()
+    conn.request("POST", _OPENROUTER.path, body=body, headers=headers)
+    return conn.getresponse()
+
+
 def call_openrouter(prompt: str, model: str, api_key: str, max_tokens: int = 2600) -> str:
     payload = {
         "model": model,
@@ -68,49 +239,86 @@ def call_openrouter(prompt: str, model: str, api_key: str, max_tokens: int = 260
         "max_tokens": max_tokens,
     }
 
-    req = urllib.request.Request(
-        OPENROUTER_URL,
-        data=json.dumps(payload).encode("utf-8"),
-        headers={
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://dashwood.dev",
-        },
-    )
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    headers = openrouter_headers(api_key)
 
     for attempt in range(6):
+        wait_for_rate_limit()
         try:
-            with urllib.request.urlopen(req, timeout=120) as resp:
-                data = json.loads(resp.read())
-                return data["choices"][0]["message"]["content"].strip()
-        except urllib.error.HTTPError as exc:
-            body = ""
-            try:
-                body = exc.read().decode("utf-8", errors="replace")[:400]
-            except Exception:
-                pass
-            if exc.code == 429 and attempt < 5:
-                time.sleep(min(30, 2 ** attempt + 2))
-                continue
-            if exc.code >= 500 and attempt < 5:
-                time.sleep(min(30, 2 ** attempt + 2))
-                continue
-            raise RuntimeError(f"OpenRouter HTTP {exc.code}: {body}")
-        except urllib.error.URLError as exc:
+            resp = send_openrouter_request(body, headers)
+            raw = resp.read()
+        except (OSError, http.client.HTTPException) as exc:
+            drop_openrouter_connection()
             if attempt < 5:
-                time.sleep(min(30, 2 ** attempt + 2))
+                time.sleep(backoff_seconds(attempt))
                 continue
             raise RuntimeError(f"OpenRouter connection error: {exc}")
 
+        if resp.will_close:
+            drop_openrouter_connection()
+
+        if resp.status >= 400:
+            retry_after = retry_after_seconds(resp.getheader("Retry-After"))
+            if resp.status == 429 and attempt < 5:
+                defer_requests(retry_after if retry_after is not None else backoff_seconds(attempt))
+                continue
+            if resp.status >= 500 and attempt < 5:
+                time.sleep(retry_after if retry_after is not None else backoff_seconds(attempt))
+                continue
+            detail = raw.decode("utf-8", errors="replace")[:400]
+            raise RuntimeError(f"OpenRouter HTTP {resp.status}: {detail}")
+
+        data = json.loads(raw)
+        return data["choices"][0]["message"]["content"].strip()
+
     raise RuntimeError("OpenRouter request failed after retries")
 
 
+def response_cache_path(model: str, prompt: str) -> Path:
+    key = hashlib.sha256((model + "\x00" + prompt).encode("utf-8", "surrogatepass")).hexdigest()
+    # Shard by prefix so a long backfill doesn't produce one huge flat directory.
+    return CACHE_DIR / key[:2] / f"{key}.json"
+
+
+def read_cached_response(path: Path) -> str | None:
+    try:
+        data = json.loads(path.read_bytes())
+    except (OSError, ValueError):
+        return None
+    content = data.get("content") if isinstance(data, dict) else None
+    return content if isinstance(content, str) else None
+
+
+def write_cached_response(path: Path, model: str, content: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=path.parent, suffix=".tmp", delete=False)
+    try:
+        with tmp:
+            json.dump({"model": model, "content": content}, tmp)
+        os.replace(tmp.name, path)
+    except BaseException:
+        Path(tmp.name).unlink(missing_ok=True)
+        raise
+
+
+def _loads_object(text: str) -> dict[str, Any] | None:
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError:
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
 def parse_json_response(text: str) -> dict[str, Any]:
     candidate = text.strip()
 
-    if candidate.startswith("```"):
-        candidate = re.sub(r"^```(?:json)?", "", candidate).strip()
-        candidate = re.sub(r"```$", "", candidate).strip()
+    # Fast path: most responses are bare JSON, or JSON wrapped in a single fence.
+    parsed = _loads_object(candidate)
+    if parsed is None and candidate.startswith("```"):
+        candidate = candidate.removeprefix("```").removeprefix("json").removesuffix("```").strip()
+        parsed = _loads_object(candidate)
+    if parsed is not None:
+        return parsed
 
     start = candidate.find("{")
     end = candidate.rfind("}")
@@ -118,22 +326,42 @@ def parse_json_response(text: str) -> dict[str, Any]:
         candidate = candidate[start : end + 1]
 
     try:
-        return json.loads(candidate)
+        parsed = json.loads(candidate)
     except json.JSONDecodeError:
         # Common model glitch: invalid backslash escapes inside markdown/code blocks.
-        candidate = re.sub(r"(?<!\\)\\(?![\"\\/bfnrtu])", r"\\\\", candidate)
-        return json.loads(candidate)
+        candidate = _BAD_ESC_RE.sub(r"\\\\", candidate)
+        parsed = json.loads(candidate)
+
+    if not isinstance(parsed, dict):
+        raise RuntimeError(f"Model returned a JSON {type(parsed).__name__}, expected an object")
+    return parsed
 
 
 def slugify(text: str) -> str:
     text = text.lower().strip()
-    text = re.sub(r"[^a-z0-9]+", "-", text)
+    text = _SLUG_RE.sub("-", text)
     text = text.strip("-")
     return text[:80] or "untitled"
 
 
 def yaml_quote(text: str) -> str:
-    return text.replace("\\", "\\\\").replace('"', '\\"')
+    return text.translate(_YAML_TRANS)
+
+
+def normalize_tags(tags: Any, defaults: tuple[str, ...]) -> list[str]:
+    # One pass: strip, drop blanks, and dedupe case-insensitively (models emit "Laravel" and "laravel").
+    seen: dict[str, str] = {}
+    for tag in tags if isinstance(tags, list) else []:
+        text = str(tag).strip()
+        if text:
+            seen.setdefault(text.lower(), text)
+
+    out = list(seen.values())[:6]
+    if len(out) < 3:
+        for tag in defaults:
+            seen.setdefault(tag.lower(), tag)
+        out = list(seen.values())[:3]
+    return out
 
 
 def existing_posts_by_date() -> dict[str, list[Path]]:
@@ -141,11 +369,15 @@ def existing_posts_by_date() -> dict[str, list[Path]]:
     if not BLOG_DIR.exists():
         return out
 
-    for path in BLOG_DIR.glob("*.mdx"):
-        m = re.match(r"^(\d{4}-\d{2}-\d{2})-", path.name)
-        if not m:
-            continue
-        out.setdefault(m.group(1), []).append(path)
+    # Cheap fixed-position check for a "YYYY-MM-DD-" prefix; avoids a Path and regex per entry.
+    with os.scandir(BLOG_DIR) as entries:
+        for entry in entries:
+            name = entry.name
+            if not name.endswith(".mdx") or name[4:5] != "-" or name[7:8] != "-" or name[10:11] != "-":
+                continue
+            if not (name[0:4].isdigit() and name[5:7].isdigit() and name[8:10].isdigit()) or not entry.is_file():
+                continue
+            out.setdefault(name[:10], []).append(Path(entry.path))
     return out
 
 
@@ -164,9 +396,10 @@ def maybe_regen_step1(args: argparse.Namespace):
     subprocess.run(cmd, cwd=GIT_CHRONICLE_DIR, check=True)
 
 
-def build_stack_hints(day_data: dict[str, Any]) -> str:
+@functools.lru_cache(maxsize=None)
+def build_stack_hints(projects: tuple[str, ...]) -> str:
     hints: list[str] = []
-    for project in day_data.get("projects", [])[:12]:
+    for project in projects:
         correction = PROJECT_STACK_OVERRIDES.get(project)
         if correction:
             hints.append(f"- {project}: {correction}")
@@ -183,7 +416,7 @@ def build_prompt(day: str, day_data: dict[str, Any]) -> str:
     secondary = ideas[1:] if len(ideas) > 1 else []
 
     projects = ", ".join(day_data.get("projects", [])[:8]) or "Unknown"
-    stack_hints = build_stack_hints(day_data)
+    stack_hints = build_stack_hints(tuple(day_data.get("projects", [])[:12]))
 
     primary_json = json.dumps(primary, indent=2)
     secondary_json = json.dumps(secondary, indent=2)
@@ -203,44 +436,17 @@ PRIMARY IDEA:
 ADDITIONAL IDEAS:
 {secondary_json}
 
-Return STRICT JSON only (no markdown fences, no prose outside JSON):
-{{
-  "title": "",
-  "excerpt": "",
-  "tags": ["", "", ""],
-  "content": ""
-}}
-
-Rules:
-- First-person voice, practical, builder-focused.
-- 500-1100 words.
-- Must include at least 3 section headings using Markdown (## Heading).
-- Ground claims in the supplied context; do not invent fake projects/events.
-- Treat STACK CORRECTIONS as truth even if labels/idea text suggest otherwise.
-- If supplied ideas conflict with stack corrections, rewrite them to be technically accurate.
-- Keep tone punchy and human (not corporate).
-- Excerpt must be 1 sentence, under 170 chars.
-- Tags: 3-6 concise tags.
-- Ryan only uses Next.js for this blog project (`my-portfolio` / `dashwood.net`).
-- Do NOT use `Next.js` as a tag unless the post is explicitly about this blog project.
-- For all other projects, prefer tags like `Laravel`, `Hybrid Architecture`, `Frontend`, `Full-Stack`, `PHP`.
-- `content` must be markdown body only (NO frontmatter).
-"""
+{PROMPT_RULES}"""
 
 
 def write_mdx(path: Path, date: str, title: str, excerpt: str, tags: list[str], author: str, content: str):
-    frontmatter = [
-        "---",
-        f'title: "{yaml_quote(title)}"',
-        f'date: "{date}"',
-        f'excerpt: "{yaml_quote(excerpt)}"',
-        "tags: [" + ", ".join(f'"{yaml_quote(tag)}"' for tag in tags) + "]",
-        f'author: "{yaml_quote(author)}"',
-        "---",
-        "",
-    ]
-    body = "\n".join(frontmatter) + content.strip() + "\n"
-    path.write_text(body)
+    tags_str = ", ".join(f'"{yaml_quote(tag)}"' for tag in tags)
+    path.write_text(
+        f'---\ntitle: "{yaml_quote(title)}"\ndate: "{date}"\nexcerpt: "{yaml_quote(excerpt)}"\n'
+        f'tags: [{tags_str}]\nauthor: "{yaml_quote(author)}"\n---\n{content.strip()}\n',
+        encoding="utf-8",
+        newline="\n",
+    )
 
 
 def generate_one_post(
@@ -255,7 +461,12 @@ def generate_one_post(
             p.unlink(missing_ok=True)
 
     prompt = build_prompt(day, day_data)
-    raw = call_openrouter(prompt, model=args.model, api_key=api_key)
+    cache_file = None if args.no_cache else response_cache_path(args.model, prompt)
+
+    raw = read_cached_response(cache_file) if cache_file and not args.refresh_cache else None
+    cached = raw is not None
+    if raw is None:
+        raw = call_openrouter(prompt, model=args.model, api_key=api_key)
     parsed = parse_json_response(raw)
 
     title = (parsed.get("title") or "").strip()
@@ -266,11 +477,15 @@ def generate_one_post(
     if not title or not content:
         raise RuntimeError("Model returned missing title/content")
 
-    if not isinstance(tags, list):
-        tags = []
-    tags = [str(t).strip() for t in tags if str(t).strip()][:6]
-    if len(tags) < 3:
-        tags = (tags + ["engineering", "software", "build-in-public"])[:3]
+    # Only cache responses that produced a usable post, so bad output gets retried next run.
+    if cache_file and not cached:
+        try:
+            write_cached_response(cache_file, args.model, raw)
+        except OSError as exc:
+            # The response is already paid for; losing the cache entry shouldn't lose the post.
+            print(f"WARN {day}: could not write response cache: {exc}")
+
+    tags = normalize_tags(tags, defaults=("engineering", "software", "build-in-public"))
 
     slug = slugify(title)
     out_path = BLOG_DIR / f"{day}-{slug}.mdx"
@@ -297,6 +512,8 @@ def main() -> int:
     parser.add_argument("--to-date", default="", help="Inclusive YYYY-MM-DD")
     parser.add_argument("--overwrite", action="store_true", help="Replace existing posts for same date")
     parser.add_argument("--dry-run", action="store_true", help="Show targets only")
+    parser.add_argument("--no-cache", action="store_true", help="Don't read or write the on-disk response cache")
+    parser.add_argument("--refresh-cache", action="store_true", help="Ignore cached responses and store fresh ones")
     parser.add_argument("--regen-step1", action="store_true", help="Regenerate daily ideas before writing posts")
     parser.add_argument("--step1-model", default=DEFAULT_MODEL)
     parser.add_argument("--step1-workers", type=int, default=12)
@@ -310,22 +527,20 @@ def main() -> int:
     if not ideas_path.exists():
         raise FileNotFoundError(f"Ideas file not found: {ideas_path}")
 
-    data = json.loads(ideas_path.read_text())
+    data = json.loads(ideas_path.read_bytes())
     daily = data.get("daily", {})
     if not isinstance(daily, dict) or not daily:
         raise RuntimeError(f"No daily ideas found in: {ideas_path}")
 
     existing = existing_posts_by_date()
 
-    days = sorted(daily.keys(), reverse=True)  # newest first so interrupted runs still give recent content
+    # ISO dates sort lexically, so the inclusive --from-date/--to-date window is a bisect slice.
+    days = sorted(daily.keys())
+    lo = bisect.bisect_left(days, args.from_date) if args.from_date else 0
+    hi = bisect.bisect_right(days, args.to_date) if args.to_date else len(days)
 
     targets: list[tuple[str, dict[str, Any]]] = []
-    for day in days:
-        if args.from_date and day < args.from_date:
-            continue
-        if args.to_date and day > args.to_date:
-            continue
-
+    for day in reversed(days[lo:hi]):  # newest first so interrupted runs still give recent content
         day_data = daily[day]
         if day_data.get("error"):
             continue
@@ -340,7 +555,12 @@ def main() -> int:
     if args.limit and args.limit > 0:
         targets = targets[: args.limit]
 
-    print(f"Daily ideas loaded: {len(daily)}")
+    # Only the targeted days are needed from here on; let the rest of the
+    # (potentially multi-year) chronicle be freed before the long generation phase.
+    daily_count = len(daily)
+    del data, daily
+
+    print(f"Daily ideas loaded: {daily_count}")
     print(f"Existing dated posts: {sum(len(v) for v in existing.values())}")
     print(f"Target posts to generate: {len(targets)}")
 
@@ -359,7 +579,8 @@ def main() -> int:
     failed = 0
     completed = 0
 
-    worker_count = max(1, int(args.workers))
+    # Don't spin up idle threads (and idle connections) for small runs.
+    worker_count = max(1, min(int(args.workers), len(targets)))
     print(f"Writer model: {args.model} | Parallel workers: {worker_count}")
 
     with ThreadPoolExecutor(max_workers=worker_count) as pool:
@@ -18,19 +18,27 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import email.utils
+import functools
+import heapq
 import json
+import mmap
 import os
+import random
 import re
 import subprocess
 import sys
+import tempfile
 import time
 import urllib.error
 import urllib.request
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from itertools import chain
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 from zoneinfo import ZoneInfo
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -41,6 +49,8 @@ OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
 DEFAULT_MODEL = "qwen/qwen3-235b-a22b-2507"
 DEFAULT_AUTHOR = "Ryan Dashwood"
 TZ = ZoneInfo("America/Chicago")
+PROMPT_COMMIT_LIMIT = 120
+MAX_RETRY_DELAY = 120.0
 
 # Known label drift in historical repo naming
 PROJECT_LABEL_OVERRIDES = {
@@ -48,6 +58,10 @@ PROJECT_LABEL_OVERRIDES = {
     "AustinsElite (Legacy)": "AustinsElite (Legacy PHP + some Laravel packages)",
 }
 
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+_BAD_ESC_RE = re.compile(r'(?<!\\)\\(?!["\\/bfnrtu])')
+_YAML_TRANS = str.maketrans({"\\": "\\\\", '"': '\\"'})
+
 
 @dataclass
 class Commit:
@@ -65,6 +79,41 @@ def run(cmd: list[str], cwd: Path | None = None) -> str:
     return proc.stdout
 
 
+def run_lines(cmd: list[str], cwd: Path | None = None) -> Iterator[str]:
+    """Like run(), but yield stdout lines as the command produces them."""
+    # stderr goes to a temp file, not a pipe: a chatty child would otherwise block
+    # on a full stderr pipe while we wait on stdout.
+    with tempfile.TemporaryFile() as err:
+        proc = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=err, bufsize=-1)
+        with proc:
+            for raw in proc.stdout:
+                yield raw.decode("utf-8", errors="replace").rstrip("\r\n")
+        err.seek(0)
+        stderr = err.read().decode("utf-8", errors="replace")
+    if proc.returncode != 0:
+        raise RuntimeError(f"Command failed ({proc.returncode}): {' '.join(cmd)}\n{stderr.strip()}")
+
+
+def read_env_value(env_file: Path, name: str) -> str | None:
+    """Return the value of the first `name=` line in env_file, scanning it in place via mmap."""
+    needle = name.encode("utf-8") + b"="
+    try:
+        with env_file.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[: len(needle)] == needle:
+                start = len(needle)
+            else:
+                idx = mm.find(b"\n" + needle)
+                if idx == -1:
+                    return None
+                start = idx + 1 + len(needle)
+            end = mm.find(b"\n", start)
+            value = mm[start : end if end != -1 else len(mm)]
+    except (OSError, ValueError):  # ValueError: empty files can't be mapped
+        return None
+    return value.decode("utf-8", errors="replace").strip()
+
+
+@functools.lru_cache(maxsize=1)
 def load_api_key() -> str:
     key = os.environ.get("OPENROUTER_API_KEY", "").strip()
     if key:
@@ -77,13 +126,47 @@ def load_api_key() -> str:
     ]:
         if not env_file.exists():
             continue
-        for line in env_file.read_text().splitlines():
-            if line.startswith("OPENROUTER_API_KEY="):
-                return line.split("=", 1)[1].strip()
+        value = read_env_value(env_file, "OPENROUTER_API_KEY")
+        if value is not None:
+            return value
 
     raise RuntimeError("OPENROUTER_API_KEY not found in environment or known .env files")
 
 
+@functools.lru_cache(maxsize=None)
+def openrouter_headers(api_key: str) -> dict[str, str]:
+    # Shared across calls and workers; callers must not mutate it.
+    return {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+        "HTTP-Referer": "https://dashwood.net",
+    }
+
+
+def retry_after_seconds(value: str | None) -> float | None:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds from now."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return min(MAX_RETRY_DELAY, max(0.0, float(value)))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return min(MAX_RETRY_DELAY, max(0.0, (when - datetime.now(timezone.utc)).total_seconds()))
+
+
+def backoff_seconds(attempt: int) -> float:
+    # Up to 30% jitter so workers that failed together don't retry in lockstep.
+    delay = min(30, 2 ** attempt + 2)
+    return delay + random.uniform(0, 0.3 * delay)
+
+
 def call_openrouter(prompt: str, model: str, api_key: str, max_tokens: int = 2400) -> str:
     payload = {
         "model": model,
@@ -94,12 +177,8 @@ def call_openrouter(prompt: str, model: str, api_key: str, max_tokens: int = 240
 
     req = urllib.request.Request(
         OPENROUTER_URL,
-        data=json.dumps(payload).encode("utf-8"),
-        headers={
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://dashwood.net",
-        },
+        data=json.dumps(payload, separators=(",", ":")).encode("utf-8"),
+        headers=openrouter_headers(api_key),
     )
 
     for attempt in range(6):
@@ -114,24 +193,37 @@ def call_openrouter(prompt: str, model: str, api_key: str, max_tokens: int = 240
             except Exception:
                 pass
             if exc.code in (429, 500, 502, 503, 504) and attempt < 5:
-                time.sleep(min(30, 2 ** attempt + 2))
+                retry_after = retry_after_seconds(exc.headers.get("Retry-After"))
+                time.sleep(retry_after if retry_after is not None else backoff_seconds(attempt))
                 continue
             raise RuntimeError(f"OpenRouter HTTP {exc.code}: {body}")
         except urllib.error.URLError as exc:
             if attempt < 5:
-                time.sleep(min(30, 2 ** attempt + 2))
+                time.sleep(backoff_seconds(attempt))
                 continue
             raise RuntimeError(f"OpenRouter connection error: {exc}")
 
     raise RuntimeError("OpenRouter request failed after retries")
 
 
+def _loads_object(text: str) -> dict[str, Any] | None:
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError:
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
 def parse_json_response(text: str) -> dict[str, Any]:
     candidate = text.strip()
 
-    if candidate.startswith("```"):
-        candidate = re.sub(r"^```(?:json)?", "", candidate).strip()
-        candidate = re.sub(r"```$", "", candidate).strip()
+    # Fast path: most responses are bare JSON, or JSON wrapped in a single fence.
+    parsed = _loads_object(candidate)
+    if parsed is None and candidate.startswith("```"):
+        candidate = candidate.removeprefix("```").removeprefix("json").removesuffix("```").strip()
+        parsed = _loads_object(candidate)
+    if parsed is not None:
+        return parsed
 
     start = candidate.find("{")
     end = candidate.rfind("}")
@@ -139,37 +231,52 @@ def parse_json_response(text: str) -> dict[str, Any]:
         candidate = candidate[start : end + 1]
 
     try:
-        return json.loads(candidate)
+        parsed = json.loads(candidate)
     except json.JSONDecodeError:
         # Common model glitch: invalid bare backslashes in long markdown content.
-        candidate = re.sub(r"(?<!\\)\\(?![\"\\/bfnrtu])", r"\\\\", candidate)
-        return json.loads(candidate)
+        candidate = _BAD_ESC_RE.sub(r"\\\\", candidate)
+        parsed = json.loads(candidate)
+
+    if not isinstance(parsed, dict):
+        raise RuntimeError(f"Model returned a JSON {type(parsed).__name__}, expected an object")
+    return parsed
 
 
 def slugify(text: str) -> str:
     text = text.lower().strip()
-    text = re.sub(r"[^a-z0-9]+", "-", text)
+    text = _SLUG_RE.sub("-", text)
     text = text.strip("-")
     return text[:80] or "untitled"
 
 
 def yaml_quote(text: str) -> str:
-    return text.replace("\\", "\\\\").replace('"', '\\"')
+    return text.translate(_YAML_TRANS)
+
+
+def normalize_tags(tags: Any, defaults: tuple[str, ...]) -> list[str]:
+    # One pass: strip, drop blanks, and dedupe case-insensitively (models emit "Laravel" and "laravel").
+    seen: dict[str, str] = {}
+    for tag in tags if isinstance(tags, list) else []:
+        text = str(tag).strip()
+        if text:
+            seen.setdefault(text.lower(), text)
+
+    out = list(seen.values())[:6]
+    if len(out) < 3:
+        for tag in defaults:
+            seen.setdefault(tag.lower(), tag)
+        out = list(seen.values())[:3]
+    return out
 
 
 def write_mdx(path: Path, date: str, title: str, excerpt: str, tags: list[str], author: str, content: str):
-    frontmatter = [
-        "---",
-        f'title: "{yaml_quote(title)}"',
-        f'date: "{date}"',
-        f'excerpt: "{yaml_quote(excerpt)}"',
-        "tags: [" + ", ".join(f'"{yaml_quote(tag)}"' for tag in tags) + "]",
-        f'author: "{yaml_quote(author)}"',
-        "---",
-        "",
-    ]
-    body = "\n".join(frontmatter) + content.strip() + "\n"
-    path.write_text(body)
+    tags_str = ", ".join(f'"{yaml_quote(tag)}"' for tag in tags)
+    path.write_text(
+        f'---\ntitle: "{yaml_quote(title)}"\ndate: "{date}"\nexcerpt: "{yaml_quote(excerpt)}"\n'
+        f'tags: [{tags_str}]\nauthor: "{yaml_quote(author)}"\n---\n{content.strip()}\n',
+        encoding="utf-8",
+        newline="\n",
+    )
 
 
 def resolve_target_date(raw: str) -> str:
@@ -179,49 +286,45 @@ def resolve_target_date(raw: str) -> str:
     return (datetime.now(TZ).date() - timedelta(days=1)).isoformat()
 
 
-def load_repos() -> list[tuple[str, str]]:
+@functools.lru_cache(maxsize=1)
+def load_repos() -> tuple[tuple[str, str], ...]:
+    # Imported lazily (not at module load) so runs that exit early never touch git-chronicle.
     sys.path.insert(0, str(GIT_CHRONICLE_DIR))
     try:
         import chronicle  # type: ignore
     except Exception as exc:
         raise RuntimeError(f"Unable to import git-chronicle REPOS: {exc}")
 
-    repos: list[tuple[str, str]] = []
-    for repo_path, project_name, _desc in chronicle.REPOS:
-        repos.append((repo_path, PROJECT_LABEL_OVERRIDES.get(project_name, project_name)))
-    return repos
+    # Missing checkouts are dropped here once rather than re-stat'd on every collection.
+    return tuple(
+        (repo_path, PROJECT_LABEL_OVERRIDES.get(project_name, project_name))
+        for repo_path, project_name, _desc in chronicle.REPOS
+        if Path(repo_path).is_dir()
+    )
 
 
-def collect_commits_for_date(target_date: str) -> list[Commit]:
-    repos = load_repos()
-    start = f"{target_date}T00:00:00"
-    end = f"{target_date}T23:59:59"
+def _log_one(repo_path: str, project_name: str, start: str, end: str) -> list[Commit]:
+    cmd = [
+        "git",
+        "-C",
+        repo_path,
+        "log",
+        "--no-merges",
+        "--date-order",
+        f"--since={start}",
+        f"--until={end}",
+        # NUL-separated fields: subjects may contain "|" but never NUL or newlines.
+        "--format=%H%x00%ai%x00%s",
+    ]
 
+    # Build commits while git is still streaming; a failed repo contributes nothing.
     commits: list[Commit] = []
-    for repo_path, project_name in repos:
-        if not Path(repo_path).is_dir():
-            continue
-
-        try:
-            out = run(
-                [
-                    "git",
-                    "-C",
-                    repo_path,
-                    "log",
-                    "--no-merges",
-                    f"--since={start}",
-                    f"--until={end}",
-                    "--format=%H|%ai|%s",
-                ]
-            )
-        except Exception:
-            continue
-
-        for line in out.splitlines():
-            if not line.strip() or "|" not in line:
+    try:
+        for line in run_lines(cmd):
+            parts = line.split("\x00", 2)
+            if len(parts) != 3:
                 continue
-            sha, date, message = line.split("|", 2)
+            sha, date, message = parts
             commits.append(
                 Commit(
                     sha=sha.strip(),
@@ -231,18 +334,48 @@ def collect_commits_for_date(target_date: str) -> list[Commit]:
                     repo_path=repo_path,
                 )
             )
-
-    commits.sort(key=lambda c: c.date)
+    except Exception:
+        return []
     return commits
 
 
+def collect_commits_for_date(target_date: str) -> list[Commit]:
+    repos = load_repos()
+    if not repos:
+        return []
+
+    start = f"{target_date}T00:00:00"
+    end = f"{target_date}T23:59:59"
+
+    # Each git log is an independent subprocess, so fan them out.
+    with ThreadPoolExecutor(max_workers=min(32, len(repos))) as pool:
+        results = list(pool.map(lambda rp: _log_one(rp[0], rp[1], start, end), repos))
+
+    # Left unsorted: build_prompt only needs the earliest PROMPT_COMMIT_LIMIT in order.
+    return list(chain.from_iterable(results))
+
+
+def earliest_commits(commits: list[Commit], limit: int) -> list[Commit]:
+    # nsmallest is O(N log k); a full sort is cheaper until N is well past the limit.
+    if len(commits) > 2 * limit:
+        return heapq.nsmallest(limit, commits, key=lambda c: c.date)
+    return sorted(commits, key=lambda c: c.date)[:limit]
+
+
 def build_prompt(target_date: str, commits: list[Commit]) -> str:
     by_project = Counter(c.project for c in commits)
 
-    project_lines = [f"- {name}: {count} commits" for name, count in by_project.most_common()]
+    # commits arrive unsorted, so break count ties by each project's earliest commit.
+    first_date: dict[str, str] = {}
+    for c in commits:
+        if c.project not in first_date or c.date < first_date[c.project]:
+            first_date[c.project] = c.date
+    ranked = sorted(by_project.items(), key=lambda item: (-item[1], first_date[item[0]]))
+
+    project_lines = [f"- {name}: {count} commits" for name, count in ranked]
 
     commit_lines = []
-    for c in commits[:120]:
+    for c in earliest_commits(commits, PROMPT_COMMIT_LIMIT):
         sha8 = c.sha[:8]
         commit_lines.append(f"- [{c.project}] {c.message} ({sha8})")
 
@@ -295,8 +428,13 @@ Rules:
 
 
 def existing_post_for_date(target_date: str) -> Path | None:
-    matches = sorted(BLOG_DIR.glob(f"{target_date}-*.mdx"))
-    return matches[0] if matches else None
+    if not BLOG_DIR.exists():
+        return None
+
+    prefix = f"{target_date}-"
+    with os.scandir(BLOG_DIR) as entries:
+        matches = [e.name for e in entries if e.name.startswith(prefix) and e.name.endswith(".mdx")]
+    return BLOG_DIR / min(matches) if matches else None
 
 
 def git_commit_and_push(path: Path, target_date: str, dry_run: bool):
@@ -353,11 +491,7 @@ def main() -> int:
     if not content:
         raise RuntimeError("Model returned empty content")
 
-    if not isinstance(tags, list):
-        tags = []
-    tags = [str(t).strip() for t in tags if str(t).strip()][:6]
-    if len(tags) < 3:
-        tags = (tags + ["engineering", "git", "build-in-public"])[:3]
+    tags = normalize_tags(tags, defaults=("engineering", "git", "build-in-public"))
 
     BLOG_DIR.mkdir(parents=True, exist_ok=True)
 